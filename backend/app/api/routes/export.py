@@ -20,6 +20,9 @@ from app.services.storage import storage_service
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Maximum number of ffmpeg frame extractions an export runs at once
+FRAME_EXTRACTION_CONCURRENCY = 4
+
 
 def export_to_response(export: Export) -> ExportResponse:
     """Convert an Export model to ExportResponse with URLs."""
@@ -63,12 +66,14 @@ async def process_export(
     include_transitions: bool = True,
 ):
     """Background task to process video export with optional AI-generated transitions."""
+    import asyncio
     import io
 
     from PIL import Image
     from sqlalchemy import select
     from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 
+    from app.core.concurrency import get_semaphore_manager
     from app.models.video import Export, Video
     from app.services.fal_ai import fal_ai_service
     from app.services.ffmpeg import ffmpeg_service
@@ -134,34 +139,60 @@ async def process_export(
             )
 
             # PHASE 2 & 3: Generate transitions if enabled and we have multiple videos
-            transition_paths = []
             total_transitions = (
                 len(scene_video_data) - 1
                 if include_transitions and len(scene_video_data) > 1
                 else 0
             )
+            # Indexed by the scene each transition follows; None means a hard cut
+            transition_paths: list[Path | None] = [None] * total_transitions
 
             if total_transitions > 0:
                 # Create temp directory for extracted frames
                 frames_dir = Path(tempfile.mkdtemp(prefix=f"frames_{export_id}_"))
                 logger.info("Created frames directory: %s", frames_dir)
 
-                for i in range(total_transitions):
-                    video_a_data = scene_video_data[i]
-                    video_b_data = scene_video_data[i + 1]
-                    video_a_path = scene_paths[i]
-                    video_b_path = scene_paths[i + 1]
-
-                    # Calculate progress: 10-20% for frame extraction, 20-80% for transitions
-                    frame_progress = 10 + int((i / total_transitions) * 10)
-                    await update_export_progress(
-                        db,
-                        export,
-                        "extracting_frames",
-                        f"Extracting frame {i + 1} of {total_transitions}",
-                        frame_progress,
+                transition_prompt = (
+                    "Smooth cinematic transition with gentle camera movement, "
+                    "seamless morph between scenes"
+                )
+                video_semaphore = get_semaphore_manager().video_generation
+
+                # Extract the last frame of each scene and the first frame of the next,
+                # with a bounded number of ffmpeg processes running at once
+                await update_export_progress(
+                    db,
+                    export,
+                    "extracting_frames",
+                    f"Extracting frames for {total_transitions} transitions",
+                    10,
+                )
+                extraction_slots = asyncio.Semaphore(FRAME_EXTRACTION_CONCURRENCY)
+
+                async def extract_frame_limited(video_path: Path, frame_path: Path, position: str):
+                    """Extract one frame once an extraction slot is free."""
+                    async with extraction_slots:
+                        return await ffmpeg_service.extract_frame(video_path, frame_path, position)
+
+                async def extract_boundary_frames(i: int) -> list[Path]:
+                    """Extract the frames the transition after scene i morphs between."""
+                    frame_a_end = frames_dir / f"scene_{scene_video_data[i]['id']}_last.png"
+                    frame_b_start = frames_dir / f"scene_{scene_video_data[i + 1]['id']}_first.png"
+                    return await asyncio.gather(
+                        extract_frame_limited(scene_paths[i], frame_a_end, "last"),
+                        extract_frame_limited(scene_paths[i + 1], frame_b_start, "first"),
                     )
 
+                boundary_frames = await asyncio.gather(
+                    *(extract_boundary_frames(i) for i in range(total_transitions)),
+                    return_exceptions=True,
+                )
+
+                async def build_transition(i: int) -> tuple[int, str, Path]:
+                    """Generate the transition after scene i from its boundary frames."""
+                    video_a_data = scene_video_data[i]
+                    video_b_data = scene_video_data[i + 1]
+                    frame_a_end, frame_b_start = boundary_frames[i]
                     logger.info(
                         "Generating transition %d: video %s -> video %s",
                         i + 1,
@@ -169,75 +200,95 @@ async def process_export(
                         video_b_data["id"],
                     )
 
-                    # Extract last frame from video A
-                    frame_a_end = frames_dir / f"scene_{video_a_data['id']}_last.png"
-                    await ffmpeg_service.extract_frame(video_a_path, frame_a_end, position="last")
-
-                    # Extract first frame from video B
-                    frame_b_start = frames_dir / f"scene_{video_b_data['id']}_first.png"
-                    await ffmpeg_service.extract_frame(
-                        video_b_path, frame_b_start, position="first"
-                    )
-
-                    # Calculate transition progress: 20-80% range
-                    transition_progress = 20 + int(((i + 1) / total_transitions) * 60)
-                    await update_export_progress(
-                        db,
-                        export,
-                        "generating_transitions",
-                        f"Transition {i + 1} of {total_transitions}",
-                        transition_progress,
-                    )
-
-                    # Generate transition video using Kling 2.6
-                    transition_prompt = (
-                        "Smooth cinematic transition with gentle camera movement, "
-                        "seamless morph between scenes"
-                    )
-                    try:
-                        transition_bytes = await fal_ai_service.generate_transition(
+                    # Generate transition video using Kling 2.6, streamed straight into storage
+                    async with video_semaphore:
+                        transition_relative_path = await storage_service.allocate_video_path(
+                            project_id, video_type="transition"
+                        )
+                        transition_path = storage_service.get_full_path(transition_relative_path)
+                        await fal_ai_service.generate_transition(
                             start_image_path=frame_a_end,
                             end_image_path=frame_b_start,
+                            output_path=transition_path,
                             prompt=transition_prompt,
                             duration=5.0,
                         )
+                    return i, transition_relative_path, transition_path
+
+                await update_export_progress(
+                    db,
+                    export,
+                    "generating_transitions",
+                    f"Generating {total_transitions} transitions",
+                    20,
+                )
 
-                        # Save transition video
-                        transition_relative_path = await storage_service.save_video(
-                            transition_bytes, project_id, video_type="transition"
-                        )
-                        transition_path = storage_service.get_full_path(transition_relative_path)
-                        transition_paths.append(transition_path)
-
-                        # Create transition video record in database
-                        transition_video = Video(
-                            project_id=project_id,
-                            video_type="transition",
-                            video_path=transition_relative_path,
-                            source_photo_id=video_a_data["photo_id"],
-                            target_photo_id=video_b_data["photo_id"],
-                            prompt=transition_prompt,
-                            duration_seconds=5.0,
-                            position=video_a_data["position"],  # Position after source scene
-                            status="ready",
-                        )
-                        db.add(transition_video)
-
-                        logger.info(
-                            "Transition %d generated successfully: %s",
-                            i + 1,
-                            transition_relative_path,
-                        )
-
-                    except Exception as e:
+                # Generate all transitions concurrently; the DB session is only
+                # touched from this coroutine as each one finishes
+                pending = {}
+                completed = 0
+                for i, frames in enumerate(boundary_frames):
+                    if isinstance(frames, BaseException):
                         logger.error(
-                            "Failed to generate transition %d: %s",
-                            i + 1,
-                            e,
-                            exc_info=True,
+                            "Failed to extract frames for transition %d: %s", i + 1, frames
                         )
                         # Continue without this transition - will use hard cut
-                        continue
+                        completed += 1
+                    else:
+                        pending[asyncio.create_task(build_transition(i))] = i
+                try:
+                    while pending:
+                        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            i = pending.pop(task)
+                            completed += 1
+                            try:
+                                _, transition_relative_path, transition_path = task.result()
+                            except Exception as e:
+                                logger.error(
+                                    "Failed to generate transition %d: %s",
+                                    i + 1,
+                                    e,
+                                    exc_info=True,
+                                )
+                                # Continue without this transition - will use hard cut
+                                continue
+
+                            transition_paths[i] = transition_path
+
+                            # Create transition video record in database
+                            video_a_data = scene_video_data[i]
+                            video_b_data = scene_video_data[i + 1]
+                            transition_video = Video(
+                                project_id=project_id,
+                                video_type="transition",
+                                video_path=transition_relative_path,
+                                source_photo_id=video_a_data["photo_id"],
+                                target_photo_id=video_b_data["photo_id"],
+                                prompt=transition_prompt,
+                                duration_seconds=5.0,
+                                position=video_a_data["position"],  # Position after source scene
+                                status="ready",
+                            )
+                            db.add(transition_video)
+
+                            logger.info(
+                                "Transition %d generated successfully: %s",
+                                i + 1,
+                                transition_relative_path,
+                            )
+
+                        # Transition progress: 20-80% range
+                        await update_export_progress(
+                            db,
+                            export,
+                            "generating_transitions",
+                            f"Transition {completed} of {total_transitions}",
+                            20 + int((completed / total_transitions) * 60),
+                        )
+                finally:
+                    for task in pending:
+                        task.cancel()
 
                 await db.commit()
 
@@ -247,26 +298,34 @@ async def process_export(
             final_video_paths = []
             for i, scene_path in enumerate(scene_paths):
                 final_video_paths.append(scene_path)
-                if i < len(transition_paths):
+                if i < total_transitions and transition_paths[i] is not None:
                     final_video_paths.append(transition_paths[i])
 
             logger.info(
                 "Concatenating %d videos (%d scenes, %d transitions)",
                 len(final_video_paths),
                 len(scene_paths),
-                len(transition_paths),
+                len(final_video_paths) - len(scene_paths),
             )
 
             # Create output path
             output_path = storage_service.exports_path / str(project_id) / f"export_{export_id}.mp4"
             output_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # Concatenate all videos (no FFmpeg crossfade needed - transitions are AI-generated)
-            await ffmpeg_service.concatenate_videos(
-                final_video_paths,
-                output_path,
-                transition_duration=0,  # Hard cuts between clips (AI handles transitions)
-            )
+            # Concatenate all videos (no FFmpeg crossfade needed - transitions are AI-generated).
+            # ffmpeg writes to a temporary name and the export only appears under its final
+            # name once it is complete and on disk
+            partial_output_path = output_path.with_name(f"{output_path.stem}.part.mp4")
+            try:
+                await ffmpeg_service.concatenate_videos(
+                    final_video_paths,
+                    partial_output_path,
+                    transition_duration=0,  # Hard cuts between clips (AI handles transitions)
+                )
+                await storage_service.commit_partial_file(partial_output_path, output_path)
+            except BaseException:
+                partial_output_path.unlink(missing_ok=True)
+                raise
 
             await update_export_progress(
                 db, export, "concatenating", "Videos joined successfully", 90
@@ -288,7 +347,7 @@ async def process_export(
 
                 # Compress to JPEG
                 with Image.open(thumb_frame_path) as img:
-                    if img.mode in ("RGBA", "P"):
+                    if img.mode != "RGB":
                         img = img.convert("RGB")
                     # Resize for thumbnail (max 640x360)
                     img.thumbnail((640, 360), Image.Resampling.LANCZOS)
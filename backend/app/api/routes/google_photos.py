@@ -25,7 +25,7 @@ from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_ex
 
 from app.api.deps import get_current_user
 from app.api.routes.auth import refresh_google_token
-from app.api.routes.photos import generate_prompt_for_photo
+from app.api.routes.photos import UPLOAD_CHUNK_SIZE, generate_prompt_for_photo
 from app.core.config import get_settings
 from app.core.database import get_db
 from app.models.photo import Photo
@@ -38,6 +38,15 @@ router = APIRouter()
 
 GOOGLE_PHOTOS_PICKER_API = "https://photospicker.googleapis.com/v1"
 
+# File extension to use for each imported media MIME type
+MIME_TYPE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/heic": ".heic",
+}
+
 # Shared HTTP client for Google Photos API
 _photos_client: httpx.AsyncClient | None = None
 
@@ -357,35 +366,31 @@ async def import_google_photos(
 
     for i, photo_info in enumerate(all_photos):
         try:
-            # Download the image
-            response = await client.get(
-                photo_info["downloadUrl"],
-                headers={"Authorization": f"Bearer {access_token}"},
-                follow_redirects=True,
-            )
-
-            if response.status_code != 200:
-                errors.append(
-                    {"id": photo_info["id"], "error": f"Failed to download: {response.status_code}"}
-                )
-                continue
-
-            content = response.content
             mime_type = photo_info["mimeType"]
 
             # Determine extension from content type
-            ext_map = {
-                "image/jpeg": ".jpg",
-                "image/png": ".png",
-                "image/gif": ".gif",
-                "image/webp": ".webp",
-                "image/heic": ".heic",
-            }
-            ext = ext_map.get(mime_type, ".jpg")
+            ext = MIME_TYPE_EXTENSIONS.get(mime_type, ".jpg")
             filename = f"google_photos_{photo_info['id']}{ext}"
 
-            # Save the file
-            relative_path = await storage_service.save_upload(content, filename, project_id)
+            # Stream the image straight to storage instead of buffering it
+            async with client.stream(
+                "GET",
+                photo_info["downloadUrl"],
+                headers={"Authorization": f"Bearer {access_token}"},
+                follow_redirects=True,
+            ) as response:
+                if response.status_code != 200:
+                    errors.append(
+                        {
+                            "id": photo_info["id"],
+                            "error": f"Failed to download: {response.status_code}",
+                        }
+                    )
+                    continue
+
+                relative_path = await storage_service.save_upload_stream(
+                    response.aiter_bytes(UPLOAD_CHUNK_SIZE), filename, project_id
+                )
 
             # Create photo record
             photo = Photo(
@@ -409,9 +414,9 @@ async def import_google_photos(
 
     # Start background prompt generation for each photo
     settings = get_settings()
-    logger.info(f"Starting prompt generation for {len(imported_photos)} imported photos")
+    logger.info("Starting prompt generation for %d imported photos", len(imported_photos))
     for photo in imported_photos:
-        logger.info(f"Creating prompt generation task for photo {photo.id}")
+        logger.debug("Creating prompt generation task for photo %s", photo.id)
         asyncio.create_task(generate_prompt_for_photo(photo.id, settings.database_url))
 
     # Delete the session to clean up
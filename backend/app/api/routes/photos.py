@@ -1,5 +1,6 @@
 import asyncio
 import logging
+from collections.abc import AsyncIterator
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
@@ -23,13 +24,20 @@ from app.schemas.photo import (
     RegeneratePromptRequest,
 )
 from app.services.prompt_generator import prompt_generator_service
-from app.services.storage import storage_service
+from app.services.storage import FileTooLargeError, storage_service
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+
+async def iter_upload_chunks(file: UploadFile) -> AsyncIterator[bytes]:
+    """Yield an uploaded file's content in chunks."""
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        yield chunk
 
 
 async def generate_prompt_for_photo(photo_id: UUID, database_url: str, max_retries: int = 3):
@@ -176,10 +184,8 @@ async def upload_photos(
     )
     max_position = result.scalar() or -1
 
-    uploaded_photos = []
-
-    for i, file in enumerate(files):
-        # Validate file extension
+    # Validate every file extension before writing anything
+    for file in files:
         ext = "." + file.filename.split(".")[-1].lower() if "." in file.filename else ""
         if ext not in ALLOWED_EXTENSIONS:
             raise HTTPException(
@@ -187,19 +193,35 @@ async def upload_photos(
                 detail=f"File type {ext} not allowed. Allowed: {ALLOWED_EXTENSIONS}",
             )
 
-        # Read file content
-        content = await file.read()
-
-        # Validate file size
-        if len(content) > MAX_FILE_SIZE:
+    # Stream all files to storage concurrently, validating size as they are written
+    results = await asyncio.gather(
+        *(
+            storage_service.save_upload_stream(
+                iter_upload_chunks(file), file.filename, project_id, max_size=MAX_FILE_SIZE
+            )
+            for file in files
+        ),
+        return_exceptions=True,
+    )
+    failures = [
+        (file, result) for file, result in zip(files, results) if isinstance(result, BaseException)
+    ]
+    if failures:
+        # Remove the files that did save so a rejected request leaves nothing behind
+        for result in results:
+            if isinstance(result, str):
+                await storage_service.delete_file(result)
+        file, error = failures[0]
+        if isinstance(error, FileTooLargeError):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"File {file.filename} exceeds maximum size of {MAX_FILE_SIZE // 1024 // 1024}MB",
             )
+        raise error
 
-        # Save file
-        relative_path = await storage_service.save_upload(content, file.filename, project_id)
+    uploaded_photos = []
 
+    for i, relative_path in enumerate(results):
         # Create photo record
         photo = Photo(
             project_id=project_id,
@@ -49,15 +49,13 @@ async def process_single_photo_style(
             full_path = storage_service.get_full_path(original_path)
             logger.debug("Processing image at: %s", full_path)
 
-            # Apply style transfer with optional custom prompt
-            styled_bytes = await imagen_service.apply_style(full_path, style, custom_prompt)
-            logger.debug(
-                "Style transfer complete for photo %s, got %d bytes", photo_id, len(styled_bytes)
+            # Apply style transfer with optional custom prompt, streaming the
+            # styled image straight into storage
+            styled_path = await storage_service.allocate_styled_path(original_path)
+            await imagen_service.apply_style(
+                full_path, style, storage_service.get_full_path(styled_path), custom_prompt
             )
-
-            # Save the styled image
-            styled_path = await storage_service.save_styled(styled_bytes, original_path)
-            logger.debug("Saved styled image to: %s", styled_path)
+            logger.debug("Saved styled image for photo %s to: %s", photo_id, styled_path)
 
             return (photo_id, True, styled_path)
 
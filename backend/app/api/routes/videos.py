@@ -72,19 +72,15 @@ async def process_video_generation(
         await update_video_status(video_id, "generating")
 
         try:
-            # Generate video
-            video_bytes = await fal_ai_service.generate_video(
+            # Generate video, streaming it straight into storage
+            video_path = await storage_service.allocate_video_path(project_id, "scene")
+            await fal_ai_service.generate_video(
                 storage_service.get_full_path(image_path),
                 prompt,
+                storage_service.get_full_path(video_path),
                 duration=5.0,
             )
-            logger.info(
-                "Video generation complete for %s, got %d bytes", video_id, len(video_bytes)
-            )
-
-            # Save video
-            video_path = await storage_service.save_video(video_bytes, project_id, "scene")
-            logger.debug("Saved video to: %s", video_path)
+            logger.info("Video generation complete for %s, saved to: %s", video_id, video_path)
 
             # Update record and mark as selected (deselect others for same photo)
             async with background_session_maker() as db:
@@ -48,6 +48,9 @@ class Settings(BaseSettings):
 
     # fal.ai
     fal_key: str = ""
+    # Connection pool for downloading fal.ai results
+    fal_http_max_connections: int = 100
+    fal_http_max_keepalive_connections: int = 20
 
     # JWT
     jwt_secret: str = "change-this-in-production"
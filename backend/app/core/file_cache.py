@@ -0,0 +1,50 @@
+"""Caching utilities for work derived from files on disk."""
+
+from collections.abc import Callable
+from functools import lru_cache, wraps
+from pathlib import Path
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+def cache_per_file_version(maxsize: int) -> Callable[[Callable[[Path], T]], Callable[[Path], T]]:
+    """Create a decorator caching a function of a file path per file version.
+
+    Results are keyed on the path plus the file's mtime and size, so a file
+    that is rewritten gets a fresh result. The decorated function also gets an
+    ``invalidate(path)`` method that makes the next call for path recompute,
+    for results that can go stale on their own (such as uploaded file URLs).
+
+    Args:
+        maxsize: Maximum number of results kept (least recently used are evicted)
+
+    Returns:
+        A decorator for functions taking a single Path argument
+    """
+
+    def decorator(func: Callable[[Path], T]) -> Callable[[Path], T]:
+        # Bumped by invalidate(); part of the key so stale entries are never hit
+        # again and simply age out of the LRU
+        generations: dict[str, int] = {}
+
+        @lru_cache(maxsize=maxsize)
+        def cached(path: str, mtime_ns: int, size: int, generation: int) -> T:
+            return func(Path(path))
+
+        @wraps(func)
+        def wrapper(path: Path) -> T:
+            stat = path.stat()
+            key = str(path)
+            return cached(key, stat.st_mtime_ns, stat.st_size, generations.get(key, 0))
+
+        def invalidate(path: Path) -> None:
+            """Drop the cached result for path so the next call recomputes it."""
+            key = str(path)
+            generations[key] = generations.get(key, 0) + 1
+
+        wrapper.cache_clear = cached.cache_clear
+        wrapper.invalidate = invalidate
+        return wrapper
+
+    return decorator
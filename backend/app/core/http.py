@@ -0,0 +1,89 @@
+"""Shared HTTP client for downloading results from external services."""
+
+import asyncio
+import os
+from pathlib import Path
+
+import aiofiles
+import aiofiles.os
+import httpx
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+
+from app.core.config import get_settings
+
+# Chunk size for streaming downloads to disk
+_DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# Download statuses that are retried rather than failing the download
+_RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Global HTTP client instance, shared so connections are kept alive across jobs
+_http_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it if necessary."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        settings = get_settings()
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(120.0, connect=10.0, write=60.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=settings.fal_http_max_keepalive_connections,
+                max_connections=settings.fal_http_max_connections,
+                keepalive_expiry=30.0,
+            ),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client."""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
+
+class _TransientDownloadError(RuntimeError):
+    """Download failed with a status worth retrying."""
+
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_random_exponential(multiplier=1, max=30),
+    retry=retry_if_exception_type((httpx.RequestError, _TransientDownloadError)),
+    reraise=True,
+)
+async def download_to_file(
+    url: str, output_path: Path, timeout: httpx.Timeout | None = None
+) -> Path:
+    """Stream a download to disk, retrying network errors and transient statuses.
+
+    The body is written under a temporary name, fsynced and then moved to
+    output_path, so a complete file is all that ever appears there.
+
+    Args:
+        url: URL to download
+        output_path: Path the response body is written to
+        timeout: Optional timeout overriding the shared client's default
+    """
+    client = get_http_client()
+    part_path = output_path.with_name(f"{output_path.name}.part")
+    try:
+        async with client.stream("GET", url, timeout=timeout or client.timeout) as response:
+            if response.status_code in _RETRYABLE_STATUS_CODES:
+                raise _TransientDownloadError(f"Download failed: {response.status_code}")
+            if response.status_code != 200:
+                raise RuntimeError(f"Download failed: {response.status_code}")
+            async with aiofiles.open(part_path, "wb") as f:
+                async for chunk in response.aiter_bytes(_DOWNLOAD_CHUNK_SIZE):
+                    await f.write(chunk)
+                await f.flush()
+                await asyncio.to_thread(os.fsync, f.fileno())
+        await aiofiles.os.replace(part_path, output_path)
+    except BaseException:
+        # Don't leave a partial file behind
+        part_path.unlink(missing_ok=True)
+        raise
+    return output_path
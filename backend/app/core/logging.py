@@ -1,10 +1,16 @@
 """Logging configuration for MomentLoop."""
 
+import atexit
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 
 from app.core.config import get_settings
 
+# Background listener that drains queued log records to stdout
+_queue_listener: QueueListener | None = None
+
 
 def setup_logging() -> None:
     """Configure logging for the application."""
@@ -24,12 +30,30 @@ def setup_logging() -> None:
     if settings.debug:
         level = logging.DEBUG
 
+    # Stop the listener from a previous setup_logging() call, if any
+    global _queue_listener
+    stop_logging()
+
+    # Write records to stdout from a background thread so that logging calls
+    # made on the event loop only enqueue and never block on stdout
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(
+        logging.Formatter(
+            "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
+    )
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    _queue_listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _queue_listener.start()
+    # The queue only carries the message; the stream handler adds the prefix
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+
     # Configure root logger
     logging.basicConfig(
         level=level,
-        format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-        handlers=[logging.StreamHandler(sys.stdout)],
+        handlers=[queue_handler],
         force=True,  # Override any existing configuration
     )
 
@@ -42,6 +66,29 @@ def setup_logging() -> None:
     )
 
 
+def stop_logging() -> None:
+    """Flush queued log records to stdout and stop the listener thread.
+
+    Records logged afterwards are written directly by the root logger.
+    """
+    global _queue_listener
+    if _queue_listener is None:
+        return
+    _queue_listener.stop()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, QueueHandler):
+            root.removeHandler(handler)
+    for handler in _queue_listener.handlers:
+        root.addHandler(handler)
+    _queue_listener = None
+
+
+# Flush anything still queued when the process exits without a clean shutdown
+atexit.register(stop_logging)
+
+
 def get_logger(name: str) -> logging.Logger:
     """Get a logger with the given name."""
     return logging.getLogger(name)
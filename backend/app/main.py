@@ -1,5 +1,7 @@
 import asyncio
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
@@ -10,7 +12,7 @@ from slowapi.errors import RateLimitExceeded
 
 from app.api.routes import auth, export, google_photos, jobs, photos, projects, styles, videos, websocket
 from app.core.config import get_settings
-from app.core.logging import setup_logging
+from app.core.logging import setup_logging, stop_logging
 from app.core.rate_limit import limiter
 
 # Initialize logging before anything else
@@ -25,6 +27,13 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting %s...", settings.app_name)
 
+    # Size the default executor (asyncio.to_thread, aiofiles, file cleanup)
+    # to the machine: twice the cores, between 8 and 32 threads
+    default_workers = min(32, max(8, (os.cpu_count() or 1) * 2))
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=default_workers, thread_name_prefix="default_")
+    )
+
     # Ensure storage directories exist
     settings.uploads_path.mkdir(parents=True, exist_ok=True)
     settings.styled_path.mkdir(parents=True, exist_ok=True)
@@ -47,11 +56,23 @@ async def lifespan(app: FastAPI):
     stuck_job_task = asyncio.create_task(detect_and_reset_stuck_jobs())
     logger.info("Stuck job detection started")
 
+    # Import the Gemini SDK and open its connection in the background so the
+    # first prompt generation doesn't pay for it
+    from app.services.prompt_generator import prompt_generator_service
+
+    warm_up_task = asyncio.create_task(prompt_generator_service.warm_up())
+
     yield
 
     # Shutdown
     stuck_job_task.cancel()
+    warm_up_task.cancel()
+
+    from app.core.http import close_http_client
+
+    await close_http_client()
     logger.info("Shutting down %s...", settings.app_name)
+    stop_logging()
 
 
 app = FastAPI(
@@ -1,19 +1,30 @@
 """File cleanup service for removing old exports and orphaned files."""
 
+import asyncio
 import logging
+import os
+import uuid
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
 
-from sqlalchemy import select
+from sqlalchemy import delete, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
 from app.core.database import background_session_maker
 from app.models.photo import Photo
+from app.models.styled_variant import StyledVariant
 from app.models.video import Export, Video
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Maximum number of ids per bulk DELETE statement
+DELETE_BATCH_SIZE = 1000
+
+# Maximum number of orphaned files unlinked concurrently
+ORPHAN_DELETE_CONCURRENCY = 16
+
 
 class CleanupService:
     """Service for cleaning up old and orphaned files."""
@@ -35,35 +46,50 @@ class CleanupService:
             retention_days = settings.export_retention_days
 
         cutoff_date = datetime.now(UTC) - timedelta(days=retention_days)
-        deleted_count = 0
 
         async with background_session_maker() as db:
             result = await db.execute(
-                select(Export).where(
+                select(Export.id, Export.file_path).where(
                     Export.created_at < cutoff_date,
                     Export.status == "ready",
                 )
             )
-            old_exports = result.scalars().all()
-
-            for export in old_exports:
-                try:
-                    if export.file_path:
-                        file_path = self.storage_path / export.file_path
-                        if file_path.exists():
-                            file_path.unlink()
-                            logger.info("Deleted old export file: %s", file_path)
-
-                    await db.delete(export)
-                    deleted_count += 1
-                except Exception as e:
-                    logger.error("Failed to delete export %s: %s", export.id, e)
-
+            old_exports = result.all()
+
+            # Unlink files concurrently off the event loop; only rows whose file
+            # was removed (or never existed) are deleted
+            results = await asyncio.gather(
+                *(
+                    self._unlink_export_file(export_file_path)
+                    for _, export_file_path in old_exports
+                ),
+                return_exceptions=True,
+            )
+            deleted_ids = []
+            for (export_id, _), result in zip(old_exports, results, strict=True):
+                if isinstance(result, BaseException):
+                    logger.error("Failed to delete export %s: %s", export_id, result)
+                else:
+                    deleted_ids.append(export_id)
+
+            await self._delete_exports(db, deleted_ids)
             await db.commit()
 
+        deleted_count = len(deleted_ids)
         logger.info("Cleaned up %d old exports", deleted_count)
         return deleted_count
 
+    async def _unlink_export_file(self, export_file_path: str | None) -> None:
+        """Delete an export file from storage if it exists."""
+        if not export_file_path:
+            return
+        file_path = self.storage_path / export_file_path
+        try:
+            await asyncio.to_thread(file_path.unlink)
+        except FileNotFoundError:
+            return
+        logger.info("Deleted old export file: %s", file_path)
+
     async def cleanup_orphaned_files(self) -> dict[str, int]:
         """
         Find and delete files in storage that are not referenced in the database.
@@ -75,40 +101,31 @@ class CleanupService:
             logger.info("Orphan cleanup is disabled")
             return {"uploads": 0, "styled": 0, "videos": 0}
 
-        deleted = {"uploads": 0, "styled": 0, "videos": 0}
-
         async with background_session_maker() as db:
-            # Get all referenced paths from database
-            photo_result = await db.execute(select(Photo.original_path, Photo.styled_path))
-            photo_paths = set()
-            for row in photo_result:
-                if row[0]:
-                    photo_paths.add(row[0])
-                if row[1]:
-                    photo_paths.add(row[1])
-
-            video_result = await db.execute(select(Video.video_path))
-            video_paths = {row[0] for row in video_result if row[0]}
-
-            export_result = await db.execute(select(Export.file_path))
-            export_paths = {row[0] for row in export_result if row[0]}
-
-            all_referenced = photo_paths | video_paths | export_paths
-
-        # Check uploads directory
-        uploads_dir = settings.uploads_path
-        if uploads_dir.exists():
-            deleted["uploads"] = self._cleanup_directory(uploads_dir, all_referenced, "uploads")
-
-        # Check styled directory
-        styled_dir = settings.styled_path
-        if styled_dir.exists():
-            deleted["styled"] = self._cleanup_directory(styled_dir, all_referenced, "styled")
-
-        # Check videos directory
-        videos_dir = settings.videos_path
-        if videos_dir.exists():
-            deleted["videos"] = self._cleanup_directory(videos_dir, all_referenced, "videos")
+            # Get all referenced paths from database in a single query
+            referenced_stmt = union_all(
+                select(Photo.original_path),
+                select(Photo.styled_path),
+                select(StyledVariant.styled_path),
+                select(Video.video_path),
+                select(Export.file_path),
+            )
+            result = await db.execute(referenced_stmt)
+            all_referenced = {row[0] for row in result if row[0]}
+
+        # Scan and clean the three directories concurrently
+        directories = {
+            "uploads": settings.uploads_path,
+            "styled": settings.styled_path,
+            "videos": settings.videos_path,
+        }
+        counts = await asyncio.gather(
+            *(
+                self._cleanup_directory(directory, all_referenced, category)
+                for category, directory in directories.items()
+            )
+        )
+        deleted = dict(zip(directories, counts, strict=True))
 
         logger.info(
             "Cleaned up orphaned files: %d uploads, %d styled, %d videos",
@@ -118,52 +135,66 @@ class CleanupService:
         )
         return deleted
 
-    def _cleanup_directory(
+    async def _cleanup_directory(
         self,
         directory: Path,
         referenced_paths: set[str],
         category: str,
     ) -> int:
         """Clean up orphaned files in a directory."""
-        deleted_count = 0
-
-        for file_path in directory.rglob("*"):
-            if not file_path.is_file():
-                continue
+        orphans = await asyncio.to_thread(self._find_orphans, directory, referenced_paths)
+        semaphore = asyncio.Semaphore(ORPHAN_DELETE_CONCURRENCY)
 
-            # Get relative path from storage root
-            try:
-                relative_path = str(file_path.relative_to(self.storage_path))
-            except ValueError:
-                continue
-
-            if relative_path not in referenced_paths:
+        async def delete_orphan(relative_path: str) -> bool:
+            file_path = self.storage_path / relative_path
+            async with semaphore:
                 try:
-                    file_path.unlink()
-                    logger.debug("Deleted orphaned %s file: %s", category, file_path)
-                    deleted_count += 1
+                    await asyncio.to_thread(file_path.unlink)
                 except Exception as e:
                     logger.error("Failed to delete orphaned file %s: %s", file_path, e)
-
-        return deleted_count
+                    return False
+            logger.debug("Deleted orphaned %s file: %s", category, file_path)
+            return True
+
+        results = await asyncio.gather(*(delete_orphan(path) for path in orphans))
+        return sum(results)
+
+    def _find_orphans(self, directory: Path, referenced_paths: set[str]) -> set[str]:
+        """Return storage-relative paths of files under directory that are not referenced."""
+        try:
+            relative_root = os.fspath(directory.relative_to(self.storage_path))
+        except ValueError:
+            return set()
+
+        # Collect every file as a path relative to the storage root in one walk,
+        # then diff against the referenced set instead of checking file by file
+        root = os.fspath(directory)
+        disk_paths = {
+            os.path.join(relative_root + dirpath[len(root) :], filename)
+            for dirpath, _, filenames in os.walk(root)
+            for filename in filenames
+        }
+        return disk_paths - referenced_paths
 
     async def cleanup_failed_exports(self) -> int:
         """Delete export records that failed processing."""
-        deleted_count = 0
-
         async with background_session_maker() as db:
-            result = await db.execute(select(Export).where(Export.status == "failed"))
-            failed_exports = result.scalars().all()
-
-            for export in failed_exports:
-                await db.delete(export)
-                deleted_count += 1
+            result = await db.execute(select(Export.id).where(Export.status == "failed"))
+            failed_ids = list(result.scalars().all())
 
+            await self._delete_exports(db, failed_ids)
             await db.commit()
 
+        deleted_count = len(failed_ids)
         logger.info("Cleaned up %d failed exports", deleted_count)
         return deleted_count
 
+    async def _delete_exports(self, db: AsyncSession, export_ids: list[uuid.UUID]) -> None:
+        """Delete export rows using batched bulk DELETE statements."""
+        for start in range(0, len(export_ids), DELETE_BATCH_SIZE):
+            batch = export_ids[start : start + DELETE_BATCH_SIZE]
+            await db.execute(delete(Export).where(Export.id.in_(batch)))
+
     async def run_full_cleanup(self) -> dict:
         """Run all cleanup tasks."""
         results = {
@@ -1,5 +1,4 @@
 import asyncio
-import base64
 import io
 import logging
 from concurrent.futures import ThreadPoolExecutor
@@ -11,6 +10,8 @@ from PIL import Image
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 from app.core.config import get_settings
+from app.core.file_cache import cache_per_file_version
+from app.core.http import download_to_file, get_http_client
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -18,6 +19,18 @@ settings = get_settings()
 # Shared thread pool for fal.ai operations
 _fal_executor = ThreadPoolExecutor(max_workers=10, thread_name_prefix="fal_ai_")
 
+# Videos are large, so allow a longer read timeout than the shared client default
+_VIDEO_DOWNLOAD_TIMEOUT = httpx.Timeout(300.0, connect=10.0, write=60.0)
+
+# Number of uploaded image URLs remembered for reuse
+_UPLOAD_CACHE_SIZE = 256
+
+
+@cache_per_file_version(maxsize=_UPLOAD_CACHE_SIZE)
+def _upload_image(image_path: Path) -> str:
+    """Upload an image to fal.ai storage, reusing the URL while the file is unchanged."""
+    return fal_client.upload_file(image_path)
+
 
 class FalAIService:
     """fal.ai service for video generation using Kling 2.1."""
@@ -33,63 +46,39 @@ class FalAIService:
     def __init__(self):
         if settings.fal_key:
             fal_client.api_key = settings.fal_key
-        self._http_client: httpx.AsyncClient | None = None
-
-    async def _get_http_client(self) -> httpx.AsyncClient:
-        """Get or create a shared HTTP client for downloads."""
-        if self._http_client is None or self._http_client.is_closed:
-            self._http_client = httpx.AsyncClient(
-                timeout=httpx.Timeout(300.0),  # 5 min timeout for video downloads
-                limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
-            )
-        return self._http_client
 
     async def generate_video(
         self,
         image_path: Path,
         prompt: str,
+        output_path: Path,
         duration: float = 5.0,
         model: str = "pro",
-    ) -> bytes:
+    ) -> Path:
         """
         Generate a video from an image using Kling 2.1.
 
         Args:
             image_path: Path to the source image
             prompt: Animation prompt describing the movement
+            output_path: Path the generated video is written to
             duration: Video duration in seconds (default 5)
             model: Model quality tier - "turbo", "pro", or "master"
 
         Returns:
-            Video content as bytes
+            Path to the downloaded video
         """
-        # Read image in thread pool to avoid blocking
         loop = asyncio.get_running_loop()
 
-        def read_image():
-            with open(image_path, "rb") as f:
-                return f.read()
-
-        image_data = await loop.run_in_executor(_fal_executor, read_image)
-
-        # Determine image type
-        ext = image_path.suffix.lower()
-        mime_type = {
-            ".jpg": "image/jpeg",
-            ".jpeg": "image/jpeg",
-            ".png": "image/png",
-            ".gif": "image/gif",
-            ".webp": "image/webp",
-        }.get(ext, "image/jpeg")
-
-        image_base64 = base64.b64encode(image_data).decode()
-        image_url = f"data:{mime_type};base64,{image_base64}"
+        # Upload the image to fal.ai storage so the job references it by URL
+        # instead of carrying a base64 data URL in the request payload
+        image_url = await loop.run_in_executor(_fal_executor, _upload_image, image_path)
 
         # Get model endpoint
         model_id = self.MODELS.get(model, self.MODELS["pro"])
         logger.info("Using Kling model: %s", model_id)
         logger.info("Sending prompt to fal.ai: %s", prompt)
-        logger.info("Image path: %s, Image size: %d bytes", image_path, len(image_data))
+        logger.info("Image path: %s, uploaded to: %s", image_path, image_url)
 
         # Submit to fal.ai and wait for result
         def run_job():
@@ -106,7 +95,13 @@ class FalAIService:
             # Poll for result (this blocks until complete)
             return handle.get()
 
-        result = await loop.run_in_executor(_fal_executor, run_job)
+        try:
+            result = await loop.run_in_executor(_fal_executor, run_job)
+        except Exception:
+            # The cached upload URL may have expired on fal.ai's side; upload
+            # again next time instead of resubmitting a dead URL
+            _upload_image.invalidate(image_path)
+            raise
 
         logger.info("Kling response received")
 
@@ -115,9 +110,7 @@ class FalAIService:
         if not video_url:
             raise RuntimeError(f"No video URL in response: {result}")
 
-        client = await self._get_http_client()
-        response = await self._download_with_retry(client, video_url)
-        return response.content
+        return await download_to_file(video_url, output_path, timeout=_VIDEO_DOWNLOAD_TIMEOUT)
 
     @retry(
         stop=stop_after_attempt(3),
@@ -136,9 +129,10 @@ class FalAIService:
         self,
         start_image_path: Path,
         end_image_path: Path,
+        output_path: Path,
         prompt: str | None = None,
         duration: float = 5.0,
-    ) -> bytes:
+    ) -> Path:
         """
         Generate a transition video between two images using Kling 2.6.
 
@@ -147,11 +141,12 @@ class FalAIService:
         Args:
             start_image_path: Path to the starting frame
             end_image_path: Path to the ending frame
+            output_path: Path the generated video is written to
             prompt: Optional transition prompt
             duration: Transition duration in seconds (5 or 10 for Kling 2.6)
 
         Returns:
-            Video content as bytes
+            Path to the downloaded video
         """
         if not prompt:
             prompt = "Smooth cinematic transition, camera movement, seamless morph to next scene"
@@ -159,34 +154,33 @@ class FalAIService:
         loop = asyncio.get_running_loop()
 
         # Read and compress images to reduce size (max 1920x1080, JPEG quality 85)
-        def read_and_compress_images():
-            def compress_image(path: Path) -> bytes:
-                with Image.open(path) as img:
-                    # Convert to RGB if necessary (for PNG with alpha)
-                    if img.mode in ("RGBA", "P"):
-                        img = img.convert("RGB")
-
-                    # Resize if too large (max 1920x1080 while maintaining aspect ratio)
-                    max_size = (1920, 1080)
-                    img.thumbnail(max_size, Image.Resampling.LANCZOS)
-
-                    # Save as JPEG with good quality
-                    buffer = io.BytesIO()
-                    img.save(buffer, format="JPEG", quality=85, optimize=True)
-                    return buffer.getvalue()
-
-            start_data = compress_image(start_image_path)
-            end_data = compress_image(end_image_path)
-            return start_data, end_data
-
-        start_data, end_data = await loop.run_in_executor(_fal_executor, read_and_compress_images)
-
-        # Use JPEG mime type since we compressed to JPEG
-        start_base64 = base64.b64encode(start_data).decode()
-        end_base64 = base64.b64encode(end_data).decode()
+        def compress_image(path: Path) -> bytes:
+            max_size = (1920, 1080)
+            with Image.open(path) as img:
+                # Convert to RGB if necessary (PNG with alpha, palette, grayscale, CMYK)
+                if img.mode != "RGB":
+                    img = img.convert("RGB")
+
+                # Resize if too large (max 1920x1080 while maintaining aspect ratio)
+                img.thumbnail(max_size, Image.Resampling.LANCZOS)
+
+                # Save as JPEG with good quality (skip the extra Huffman optimization
+                # pass; the frame is only uploaded once so encode speed matters more)
+                buffer = io.BytesIO()
+                img.save(buffer, format="JPEG", quality=85)
+                return buffer.getvalue()
+
+        # Compress both frames in parallel on the shared pool
+        start_data, end_data = await asyncio.gather(
+            loop.run_in_executor(_fal_executor, compress_image, start_image_path),
+            loop.run_in_executor(_fal_executor, compress_image, end_image_path),
+        )
 
-        start_url = f"data:image/jpeg;base64,{start_base64}"
-        end_url = f"data:image/jpeg;base64,{end_base64}"
+        # Upload the compressed JPEGs to fal.ai storage instead of inlining them
+        start_url, end_url = await asyncio.gather(
+            loop.run_in_executor(_fal_executor, fal_client.upload, start_data, "image/jpeg"),
+            loop.run_in_executor(_fal_executor, fal_client.upload, end_data, "image/jpeg"),
+        )
 
         # Use Kling 2.6 which supports end_image_url
         model_id = self.MODELS["v2.6"]
@@ -234,9 +228,7 @@ class FalAIService:
         if not video_url:
             raise RuntimeError(f"No video URL in response: {result}")
 
-        client = await self._get_http_client()
-        response = await self._download_with_retry(client, video_url)
-        return response.content
+        return await download_to_file(video_url, output_path, timeout=_VIDEO_DOWNLOAD_TIMEOUT)
 
     async def generate_image(
         self,
@@ -284,7 +276,7 @@ class FalAIService:
         if not image_url:
             raise RuntimeError(f"No image URL in response: {result}")
 
-        client = await self._get_http_client()
+        client = get_http_client()
         response = await self._download_with_retry(client, image_url)
         return response.content
 
@@ -294,10 +286,5 @@ class FalAIService:
         # until completion, so this method is less useful. Kept for compatibility.
         return {"status": "unknown"}
 
-    async def close(self):
-        """Clean up resources."""
-        if self._http_client and not self._http_client.is_closed:
-            await self._http_client.aclose()
-
 
 fal_ai_service = FalAIService()
@@ -1,5 +1,4 @@
 import asyncio
-import subprocess
 import tempfile
 from pathlib import Path
 
@@ -7,6 +6,22 @@ from app.core.config import get_settings
 
 settings = get_settings()
 
+# Trailing characters of ffmpeg stderr included in error messages
+_STDERR_TAIL_CHARS = 2000
+
+
+async def _run_ffmpeg(cmd: list[str]) -> None:
+    """Run an ffmpeg command, discarding stdout and raising with the stderr tail on failure."""
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await process.communicate()
+    if process.returncode:
+        tail = stderr.decode(errors="replace")[-_STDERR_TAIL_CHARS:]
+        raise RuntimeError(f"ffmpeg exited with code {process.returncode}: {tail}")
+
 
 class FFmpegService:
     """Service for video manipulation using FFmpeg."""
@@ -29,49 +44,35 @@ class FFmpegService:
             Path to the extracted frame
         """
         if position == "first":
-            # Extract first frame
+            # Extract first frame - seek before -i so only the first frame is decoded
             cmd = [
                 "ffmpeg",
                 "-y",
+                "-ss",
+                "0",
                 "-i",
                 str(video_path),
-                "-vf",
-                "select=eq(n\\,0)",
                 "-vframes",
                 "1",
                 str(output_path),
             ]
         else:
-            # Extract last frame - first get duration
-            probe_cmd = [
-                "ffprobe",
-                "-v",
-                "error",
-                "-show_entries",
-                "format=duration",
-                "-of",
-                "default=noprint_wrappers=1:nokey=1",
-                str(video_path),
-            ]
-            result = await asyncio.to_thread(
-                subprocess.run, probe_cmd, capture_output=True, text=True
-            )
-            duration = float(result.stdout.strip())
-
-            # Extract frame near the end
+            # Extract last frame - seek relative to the end of the input so no
+            # ffprobe round-trip is needed; -update keeps overwriting the image,
+            # leaving the final decoded frame
             cmd = [
                 "ffmpeg",
                 "-y",
-                "-ss",
-                str(duration - 0.1),
+                "-sseof",
+                "-0.5",
                 "-i",
                 str(video_path),
-                "-vframes",
+                "-update",
                 "1",
                 str(output_path),
             ]
 
-        await asyncio.to_thread(subprocess.run, cmd, capture_output=True, check=True)
+        await _run_ffmpeg(cmd)
         return output_path
 
     async def get_video_duration(self, video_path: Path) -> float:
@@ -86,8 +87,13 @@ class FFmpegService:
             "default=noprint_wrappers=1:nokey=1",
             str(video_path),
         ]
-        result = await asyncio.to_thread(subprocess.run, cmd, capture_output=True, text=True)
-        return float(result.stdout.strip())
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        stdout, _ = await process.communicate()
+        return float(stdout.decode().strip())
 
     async def concatenate_videos(
         self,
@@ -120,7 +126,7 @@ class FFmpegService:
                 "copy",
                 str(output_path),
             ]
-            await asyncio.to_thread(subprocess.run, cmd, capture_output=True, check=True)
+            await _run_ffmpeg(cmd)
             return output_path
 
         # Create a temporary file list for concat
@@ -182,7 +188,7 @@ class FFmpegService:
                     str(output_path),
                 ]
 
-            await asyncio.to_thread(subprocess.run, cmd, capture_output=True, check=True)
+            await _run_ffmpeg(cmd)
 
         finally:
             # Clean up temp file
@@ -221,7 +227,7 @@ class FFmpegService:
             "-shortest",
             str(output_path),
         ]
-        await asyncio.to_thread(subprocess.run, cmd, capture_output=True, check=True)
+        await _run_ffmpeg(cmd)
         return output_path
 
     async def resize_video(
@@ -256,7 +262,7 @@ class FFmpegService:
             "fast",
             str(output_path),
         ]
-        await asyncio.to_thread(subprocess.run, cmd, capture_output=True, check=True)
+        await _run_ffmpeg(cmd)
         return output_path
 
 
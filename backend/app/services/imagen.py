@@ -1,14 +1,15 @@
 import asyncio
-import base64
 import logging
 from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 from pathlib import Path
 
 import fal_client
-import httpx
 from PIL import Image
 
 from app.core.config import get_settings
+from app.core.file_cache import cache_per_file_version
+from app.core.http import download_to_file
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -20,9 +21,87 @@ STYLE_PROMPTS = {
     "simpsons": "Restyle this image with The Simpsons style.",
 }
 
-# Shared thread pool for image operations
+# Shared thread pool for blocking fal.ai calls (source upload and job wait), kept
+# apart from the default executor so slow network calls can't starve it
 _image_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="imagen_")
 
+# JPEG sources up to this size are sent without re-encoding
+_JPEG_PASSTHROUGH_MAX_BYTES = 4 * 1024 * 1024
+
+# EXIF tag holding the image orientation
+_EXIF_ORIENTATION = 0x0112
+
+# JPEG segments that can carry camera, location or author details (XMP, IPTC)
+_METADATA_SEGMENTS = frozenset({"APP1", "APP13"})
+
+# Number of prepared style-transfer sources remembered for reuse
+_PREPARED_IMAGE_CACHE_SIZE = 64
+
+
+def _has_private_metadata(img: Image.Image) -> bool:
+    """Check whether a JPEG carries metadata beyond its orientation.
+
+    Such files are re-encoded rather than uploaded as-is, so camera and GPS
+    details never leave the server.
+    """
+    if set(img.getexif()) - {_EXIF_ORIENTATION}:
+        return True
+    # The EXIF block itself was checked above; any other APP1 (XMP) or APP13
+    # (IPTC) segment is metadata we can't vet
+    return any(
+        marker in _METADATA_SEGMENTS and not data.startswith(b"Exif\x00")
+        for marker, data in getattr(img, "applist", [])
+    )
+
+
+@cache_per_file_version(maxsize=_PREPARED_IMAGE_CACHE_SIZE)
+def _prepare_image(image_path: Path) -> tuple[str, int, int, int]:
+    """Prepare and upload a source image, reused while the file is unchanged.
+
+    Returns:
+        Tuple of (uploaded image URL, uploaded byte count, width, height)
+    """
+    max_size = (1920, 1080)
+    with Image.open(image_path) as img:
+        # Upright RGB JPEGs that already fit and carry no private metadata are
+        # sent as-is, skipping the decode and re-encode
+        if (
+            img.format == "JPEG"
+            and img.mode == "RGB"
+            and img.width <= max_size[0]
+            and img.height <= max_size[1]
+            and img.getexif().get(_EXIF_ORIENTATION, 1) == 1
+            and not _has_private_metadata(img)
+            and image_path.stat().st_size <= _JPEG_PASSTHROUGH_MAX_BYTES
+        ):
+            width, height = img.size
+            image_data = image_path.read_bytes()
+        else:
+            # Let libjpeg downscale by 2/4/8x while decoding large JPEGs; the
+            # result stays at least max_size, so thumbnail() still does the final fit
+            img.draft("RGB", max_size)
+
+            # Convert to RGB if necessary
+            if img.mode != "RGB":
+                img = img.convert("RGB")
+
+            # Resize if too large (max 1920x1080)
+            img.thumbnail(max_size, Image.Resampling.LANCZOS)
+
+            # Get original dimensions for aspect ratio
+            width, height = img.size
+
+            # Save to buffer; quality 85 matches the video source images and is
+            # visually indistinguishable once the model restyles the picture
+            buffer = BytesIO()
+            img.save(buffer, format="JPEG", quality=85)
+            image_data = buffer.getvalue()
+
+    # Upload the raw JPEG to fal.ai storage so the job references it by URL
+    # instead of carrying a base64 data URL in the request payload
+    image_url = fal_client.upload(image_data, "image/jpeg")
+    return image_url, len(image_data), width, height
+
 
 class ImagenService:
     """fal.ai Nano Banana Pro service for image style transfer."""
@@ -32,69 +111,43 @@ class ImagenService:
     def __init__(self):
         if settings.fal_key:
             fal_client.api_key = settings.fal_key
-        self._http_client: httpx.AsyncClient | None = None
-
-    async def _get_http_client(self) -> httpx.AsyncClient:
-        """Get or create a shared HTTP client for downloads."""
-        if self._http_client is None or self._http_client.is_closed:
-            self._http_client = httpx.AsyncClient(
-                timeout=httpx.Timeout(120.0),
-                limits=httpx.Limits(max_keepalive_connections=5, max_connections=10),
-            )
-        return self._http_client
 
     async def apply_style(
-        self, image_path: Path, style: str, custom_prompt: str | None = None
-    ) -> bytes:
+        self,
+        image_path: Path,
+        style: str,
+        output_path: Path,
+        custom_prompt: str | None = None,
+    ) -> Path:
         """
         Apply a style to an image using fal.ai Nano Banana Pro.
-        Returns the styled image as bytes.
+        Streams the styled image to output_path and returns it.
 
         Args:
             image_path: Path to the source image
             style: Style key (ghibli, lego, minecraft, simpsons)
+            output_path: Path the styled image is written to
             custom_prompt: Optional custom prompt to use instead of the default
         """
-        if style not in STYLE_PROMPTS:
-            raise ValueError(f"Unknown style: {style}. Available: {list(STYLE_PROMPTS.keys())}")
+        default_prompt = STYLE_PROMPTS.get(style)
+        if default_prompt is None:
+            raise ValueError(f"Unknown style: {style}. Available: {list(STYLE_PROMPTS)}")
 
         if not settings.fal_key:
             raise RuntimeError("FAL_KEY not configured")
 
         # Use custom prompt if provided, otherwise use default
-        prompt = custom_prompt if custom_prompt else STYLE_PROMPTS[style]
+        prompt = custom_prompt if custom_prompt else default_prompt
 
+        # Read, prepare and upload the image
         loop = asyncio.get_running_loop()
-
-        # Read and prepare image
-        def prepare_image():
-            with Image.open(image_path) as img:
-                # Convert to RGB if necessary
-                if img.mode in ("RGBA", "P"):
-                    img = img.convert("RGB")
-
-                # Resize if too large (max 1920x1080)
-                max_size = (1920, 1080)
-                img.thumbnail(max_size, Image.Resampling.LANCZOS)
-
-                # Get original dimensions for aspect ratio
-                width, height = img.size
-
-                # Save to buffer
-                from io import BytesIO
-                buffer = BytesIO()
-                img.save(buffer, format="JPEG", quality=95)
-                return buffer.getvalue(), width, height
-
-        image_data, width, height = await loop.run_in_executor(_image_executor, prepare_image)
-
-        # Convert to base64 data URL
-        image_base64 = base64.b64encode(image_data).decode()
-        image_url = f"data:image/jpeg;base64,{image_base64}"
+        image_url, image_size, width, height = await loop.run_in_executor(
+            _image_executor, _prepare_image, image_path
+        )
 
         logger.info("Sending image to fal.ai Nano Banana Pro for %s style transfer", style)
         logger.info("Prompt: %s", prompt)
-        logger.info("Image size: %dx%d, %d bytes", width, height, len(image_data))
+        logger.info("Image size: %dx%d, %d bytes", width, height, image_size)
 
         # Submit to fal.ai
         def run_job():
@@ -107,7 +160,13 @@ class ImagenService:
             )
             return handle.get()
 
-        result = await loop.run_in_executor(_image_executor, run_job)
+        try:
+            result = await loop.run_in_executor(_image_executor, run_job)
+        except Exception:
+            # The cached upload URL may have expired on fal.ai's side; prepare and
+            # upload again next time instead of resubmitting a dead URL
+            _prepare_image.invalidate(image_path)
+            raise
 
         logger.info("Nano Banana Pro response received")
 
@@ -120,20 +179,11 @@ class ImagenService:
         if not image_result_url:
             raise RuntimeError(f"No image URL in response: {result}")
 
-        # Download the styled image
-        client = await self._get_http_client()
-        response = await client.get(image_result_url)
-        if response.status_code != 200:
-            raise RuntimeError(f"Failed to download styled image: {response.status_code}")
-
-        logger.info("Downloaded styled image: %d bytes", len(response.content))
-        return response.content
+        # Stream the styled image to disk
+        await download_to_file(image_result_url, output_path)
 
-    async def close(self):
-        """Clean up resources."""
-        if self._http_client and not self._http_client.is_closed:
-            await self._http_client.aclose()
-            self._http_client = None
+        logger.info("Downloaded styled image: %d bytes", output_path.stat().st_size)
+        return output_path
 
 
 imagen_service = ImagenService()
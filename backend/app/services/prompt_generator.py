@@ -1,25 +1,115 @@
 import asyncio
+import logging
 from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from google import genai
 from PIL import Image
 
 from app.core.config import get_settings
+from app.core.file_cache import cache_per_file_version
 
+if TYPE_CHECKING:
+    from google import genai
+    from google.genai import types
+
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
 # Shared thread pool for CPU-bound operations
 _prompt_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="prompt_gen_")
 
+# Number of encoded images kept for reuse by prompt regeneration; each entry holds
+# a whole encoded image (uploads are capped at 10 MB), so this bounds the cache
+# to roughly 40 MB
+_IMAGE_PART_CACHE_SIZE = 4
+
+# Image modes PNG can store directly; anything else (e.g. CMYK) is converted first
+_PNG_MODES = frozenset({"1", "L", "LA", "I", "I;16", "P", "RGB", "RGBA"})
+
+# Instruction sent with the image when generating a video animation prompt
+_VIDEO_PROMPT = """Analyze this image and generate a short, cinematic video animation prompt.
+
+Your prompt should describe:
+1. SUBJECT ACTIONS: What the people, animals, or main subjects in the image should do (e.g., "the woman turns her head and smiles", "the dog wags its tail and looks up", "the child reaches for the balloon")
+2. CAMERA MOVEMENT: Suggest one camera movement (e.g., "slow zoom in on the face", "gentle pan from left to right", "camera slowly pulls back to reveal the scene", "subtle dolly forward")
+3. ENVIRONMENTAL EFFECTS: Natural movements like wind in hair/clothes, leaves rustling, water rippling, clouds drifting, light shifting
+
+Keep the prompt under 60 words. Focus on subtle, realistic movements that bring the image to life.
+Write ONLY the animation prompt, nothing else. Do not include labels like "Subject Actions:" - just write a flowing description."""
+
+# Instruction for improving an existing prompt; filled with str.format
+_REGENERATE_PROMPT_TEMPLATE = """Here is the current video animation prompt for this image:
+
+"{current_prompt}"
+{feedback_context}
+
+Generate a new video animation prompt that improves on the current one. The prompt should describe:
+1. SUBJECT ACTIONS: What the people, animals, or main subjects should do
+2. CAMERA MOVEMENT: One camera movement (zoom, pan, dolly, etc.)
+3. ENVIRONMENTAL EFFECTS: Natural movements like wind, light shifts, etc.
+
+Keep it under 60 words. Focus on subtle, realistic movements.
+Write ONLY the animation prompt, nothing else."""
+
+
+@cache_per_file_version(maxsize=_IMAGE_PART_CACHE_SIZE)
+def _load_image_part(image_path: Path) -> "types.Part":
+    """Encode an image file as a Gemini content part, reused while the file is unchanged."""
+    from google.genai import types
+
+    with Image.open(image_path) as img:
+        if img.format == "JPEG":
+            # JPEGs are sent as-is, everything else as PNG
+            data, mime_type = image_path.read_bytes(), "image/jpeg"
+        else:
+            if img.mode not in _PNG_MODES:
+                img = img.convert("RGBA" if "A" in img.mode else "RGB")
+            buffer = BytesIO()
+            img.save(buffer, format="PNG")
+            data, mime_type = buffer.getvalue(), "image/png"
+    return types.Part.from_bytes(data=data, mime_type=mime_type)
+
+
+def _create_client() -> "genai.Client":
+    """Import google.genai and build a client; blocking, so run it in a thread."""
+    from google import genai
+
+    return genai.Client(api_key=settings.google_ai_api_key)
+
 
 class PromptGeneratorService:
     """Service for generating animation prompts from images."""
 
     def __init__(self):
-        self.client = None
-        if settings.google_ai_api_key:
-            self.client = genai.Client(api_key=settings.google_ai_api_key)
+        self._client: genai.Client | None = None
+        # Held while the client is created so concurrent first callers build only one
+        self._client_lock = asyncio.Lock()
+
+    async def get_client(self) -> "genai.Client | None":
+        """Return the Gemini client, creating it on first use.
+
+        google.genai is slow to import, so the client is built in a worker thread
+        rather than on the event loop.
+        """
+        if self._client is None and settings.google_ai_api_key:
+            async with self._client_lock:
+                if self._client is None:
+                    self._client = await asyncio.to_thread(_create_client)
+        return self._client
+
+    async def warm_up(self) -> None:
+        """Import the SDK and open a connection to Gemini ahead of the first request."""
+        try:
+            client = await self.get_client()
+            if client is None:
+                return
+            # Listing a single model is free and leaves a kept-alive TLS connection
+            await client.aio.models.list(config={"page_size": 1})
+            logger.info("Gemini client warmed up")
+        except Exception as e:
+            logger.warning("Gemini warm-up failed: %s", e)
 
     async def generate_video_prompt(self, image_path: Path) -> str:
         """
@@ -36,32 +126,20 @@ class PromptGeneratorService:
         Returns:
             A descriptive video animation prompt
         """
-        if not self.client:
+        client = await self.get_client()
+        if client is None:
             raise RuntimeError("Google AI API key not configured")
 
         loop = asyncio.get_running_loop()
 
-        # Load image in thread pool to avoid blocking
-        image = await loop.run_in_executor(_prompt_executor, Image.open, image_path)
-
-        prompt = """Analyze this image and generate a short, cinematic video animation prompt.
-
-Your prompt should describe:
-1. SUBJECT ACTIONS: What the people, animals, or main subjects in the image should do (e.g., "the woman turns her head and smiles", "the dog wags its tail and looks up", "the child reaches for the balloon")
-2. CAMERA MOVEMENT: Suggest one camera movement (e.g., "slow zoom in on the face", "gentle pan from left to right", "camera slowly pulls back to reveal the scene", "subtle dolly forward")
-3. ENVIRONMENTAL EFFECTS: Natural movements like wind in hair/clothes, leaves rustling, water rippling, clouds drifting, light shifting
-
-Keep the prompt under 60 words. Focus on subtle, realistic movements that bring the image to life.
-Write ONLY the animation prompt, nothing else. Do not include labels like "Subject Actions:" - just write a flowing description."""
+        # Load and encode image in thread pool to avoid blocking
+        image = await loop.run_in_executor(_prompt_executor, _load_image_part, image_path)
 
-        # Call SDK in thread pool (it's synchronous)
-        def call_api():
-            return self.client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=[image, prompt],
-            )
-
-        response = await loop.run_in_executor(_prompt_executor, call_api)
+        # Use the SDK's async client so the request doesn't hold a pool thread
+        response = await client.aio.models.generate_content(
+            model="gemini-2.0-flash",
+            contents=[image, _VIDEO_PROMPT],
+        )
 
         return response.text.strip()
 
@@ -95,39 +173,28 @@ Write ONLY the animation prompt, nothing else. Do not include labels like "Subje
         Returns:
             An improved animation prompt
         """
-        if not self.client:
+        client = await self.get_client()
+        if client is None:
             raise RuntimeError("Google AI API key not configured")
 
         loop = asyncio.get_running_loop()
 
-        # Load image in thread pool to avoid blocking
-        image = await loop.run_in_executor(_prompt_executor, Image.open, image_path)
+        # Load and encode image in thread pool to avoid blocking
+        image = await loop.run_in_executor(_prompt_executor, _load_image_part, image_path)
 
         feedback_context = ""
         if feedback:
             feedback_context = f"\n\nUser's modification request: {feedback}"
 
-        prompt = f"""Here is the current video animation prompt for this image:
-
-"{current_prompt}"
-{feedback_context}
-
-Generate a new video animation prompt that improves on the current one. The prompt should describe:
-1. SUBJECT ACTIONS: What the people, animals, or main subjects should do
-2. CAMERA MOVEMENT: One camera movement (zoom, pan, dolly, etc.)
-3. ENVIRONMENTAL EFFECTS: Natural movements like wind, light shifts, etc.
-
-Keep it under 60 words. Focus on subtle, realistic movements.
-Write ONLY the animation prompt, nothing else."""
-
-        # Call SDK in thread pool (it's synchronous)
-        def call_api():
-            return self.client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=[image, prompt],
-            )
+        prompt = _REGENERATE_PROMPT_TEMPLATE.format(
+            current_prompt=current_prompt, feedback_context=feedback_context
+        )
 
-        response = await loop.run_in_executor(_prompt_executor, call_api)
+        # Use the SDK's async client so the request doesn't hold a pool thread
+        response = await client.aio.models.generate_content(
+            model="gemini-2.0-flash",
+            contents=[image, prompt],
+        )
 
         return response.text.strip()
 
@@ -1,14 +1,77 @@
+import asyncio
+import logging
+import os
 import shutil
+import sys
 import uuid
+from collections.abc import AsyncIterator, Callable
 from pathlib import Path
+from types import TracebackType
+from typing import Any
 
 import aiofiles
+import aiofiles.os
 
 from app.core.config import get_settings
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
+class FileTooLargeError(ValueError):
+    """Raised when a streamed file exceeds the allowed size."""
+
+
+def _write_file(file_path: Path, file_content: bytes) -> None:
+    """Write a whole file in one blocking call; run it with asyncio.to_thread."""
+    file_path.write_bytes(file_content)
+
+
+def _write_file_durably(file_path: Path, file_content: bytes) -> None:
+    """Write a file under a temporary name, fsync it and move it into place."""
+    part_path = file_path.with_name(f"{file_path.name}.part")
+    try:
+        with open(part_path, "wb") as f:
+            f.write(file_content)
+            f.flush()
+            os.fsync(f.fileno())
+        # Readers only ever see the complete file under its final name
+        os.replace(part_path, file_path)
+    except BaseException:
+        part_path.unlink(missing_ok=True)
+        raise
+
+
+def _sync_and_replace(part_path: Path, file_path: Path) -> None:
+    """Fsync a completely written temporary file and move it to its final path."""
+    with open(part_path, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(part_path, file_path)
+
+
+def _remove_tree(directory: Path) -> None:
+    """Remove a directory tree; a tree or entry that is already gone is not an error."""
+
+    def on_exc(func: Callable[..., Any], path: str, error: BaseException) -> None:
+        if isinstance(error, FileNotFoundError):
+            return
+        logger.error("Failed to remove %s: %s", path, error)
+        raise error
+
+    if sys.version_info >= (3, 12):
+        shutil.rmtree(directory, onexc=on_exc)
+    else:
+
+        def on_error(
+            func: Callable[..., Any],
+            path: str,
+            exc_info: tuple[type[BaseException], BaseException, TracebackType],
+        ) -> None:
+            on_exc(func, path, exc_info[1])
+
+        shutil.rmtree(directory, onerror=on_error)
+
+
 class StorageService:
     """File storage service with abstraction for future cloud migration."""
 
@@ -19,29 +82,81 @@ class StorageService:
         self.videos_path = settings.videos_path
         self.exports_path = settings.exports_path
         self.thumbnails_path = settings.storage_path / "thumbnails"
+        # Resolved once; every get_full_path call checks against it
+        self._base_resolved = self.base_path.resolve()
+        # Directories already created by this process, so repeat saves skip the mkdir
+        self._created_dirs: set[Path] = set()
+
+    async def _ensure_dir(self, directory: Path) -> None:
+        """Create a directory (and parents) once per process."""
+        if directory not in self._created_dirs:
+            await aiofiles.os.makedirs(directory, exist_ok=True)
+            self._created_dirs.add(directory)
 
     async def save_upload(self, file_content: bytes, filename: str, project_id: uuid.UUID) -> str:
         """Save an uploaded file and return the relative path."""
         # Create project directory
         project_dir = self.uploads_path / str(project_id)
-        project_dir.mkdir(parents=True, exist_ok=True)
+        await self._ensure_dir(project_dir)
 
         # Generate unique filename
-        ext = Path(filename).suffix.lower()
-        unique_filename = f"{uuid.uuid4()}{ext}"
+        ext = os.path.splitext(filename)[1].lower()
+        unique_filename = f"{uuid.uuid4().hex}{ext}"
         file_path = project_dir / unique_filename
 
         # Write file
-        async with aiofiles.open(file_path, "wb") as f:
-            await f.write(file_content)
+        await asyncio.to_thread(_write_file_durably, file_path, file_content)
+
+        # Return relative path from storage root
+        return str(file_path.relative_to(self.base_path))
+
+    async def save_upload_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        filename: str,
+        project_id: uuid.UUID,
+        max_size: int | None = None,
+    ) -> str:
+        """Stream an uploaded file to disk chunk by chunk and return the relative path.
+
+        Raises:
+            FileTooLargeError: If more than max_size bytes are received; nothing is kept
+        """
+        # Create project directory
+        project_dir = self.uploads_path / str(project_id)
+        await self._ensure_dir(project_dir)
+
+        # Generate unique filename
+        ext = os.path.splitext(filename)[1].lower()
+        unique_filename = f"{uuid.uuid4().hex}{ext}"
+        file_path = project_dir / unique_filename
+
+        # Write under a temporary name, enforcing the size limit as bytes arrive,
+        # so the upload only appears under its final name once complete
+        part_path = file_path.with_name(f"{unique_filename}.part")
+        written = 0
+        try:
+            async with aiofiles.open(part_path, "wb") as f:
+                async for chunk in chunks:
+                    written += len(chunk)
+                    if max_size is not None and written > max_size:
+                        raise FileTooLargeError(f"File {filename} exceeds {max_size} bytes")
+                    await f.write(chunk)
+                await f.flush()
+                await asyncio.to_thread(os.fsync, f.fileno())
+            await aiofiles.os.replace(part_path, file_path)
+        except BaseException:
+            # Don't leave a partial upload behind
+            part_path.unlink(missing_ok=True)
+            raise
 
         # Return relative path from storage root
         return str(file_path.relative_to(self.base_path))
 
-    async def save_styled(self, file_content: bytes, original_path: str) -> str:
-        """Save a styled image and return the relative path."""
+    async def allocate_styled_path(self, original_path: str) -> str:
+        """Create the project styled directory and return a new relative path for a styled image."""
         # Parse original path to get project ID
-        parts = Path(original_path).parts
+        parts = original_path.split("/", 2)
         if len(parts) >= 2:
             project_id = parts[1]  # uploads/project_id/filename
         else:
@@ -49,74 +164,54 @@ class StorageService:
 
         # Create project directory in styled
         project_dir = self.styled_path / project_id
-        project_dir.mkdir(parents=True, exist_ok=True)
+        await self._ensure_dir(project_dir)
 
         # Generate unique filename
-        original_filename = Path(original_path).stem
-        unique_filename = f"{original_filename}_styled_{uuid.uuid4()}.png"
+        original_filename = os.path.splitext(os.path.basename(original_path))[0]
+        unique_filename = f"{original_filename}_styled_{uuid.uuid4().hex}.png"
         file_path = project_dir / unique_filename
 
-        # Write file
-        async with aiofiles.open(file_path, "wb") as f:
-            await f.write(file_content)
-
         return str(file_path.relative_to(self.base_path))
 
-    async def save_video(
-        self, file_content: bytes, project_id: uuid.UUID, video_type: str = "scene"
-    ) -> str:
-        """Save a generated video and return the relative path."""
+    async def allocate_video_path(self, project_id: uuid.UUID, video_type: str = "scene") -> str:
+        """Create the project video directory and return a new relative path for a video."""
         project_dir = self.videos_path / str(project_id)
-        project_dir.mkdir(parents=True, exist_ok=True)
+        await self._ensure_dir(project_dir)
 
-        unique_filename = f"{video_type}_{uuid.uuid4()}.mp4"
+        unique_filename = f"{video_type}_{uuid.uuid4().hex}.mp4"
         file_path = project_dir / unique_filename
 
-        async with aiofiles.open(file_path, "wb") as f:
-            await f.write(file_content)
-
         return str(file_path.relative_to(self.base_path))
 
-    async def save_export(self, file_content: bytes, project_id: uuid.UUID) -> str:
-        """Save an exported video and return the relative path."""
-        project_dir = self.exports_path / str(project_id)
-        project_dir.mkdir(parents=True, exist_ok=True)
-
-        unique_filename = f"export_{uuid.uuid4()}.mp4"
-        file_path = project_dir / unique_filename
-
-        async with aiofiles.open(file_path, "wb") as f:
-            await f.write(file_content)
-
-        return str(file_path.relative_to(self.base_path))
+    async def commit_partial_file(self, part_path: Path, file_path: Path) -> None:
+        """Make a file written under a temporary name durable and move it into place."""
+        await asyncio.to_thread(_sync_and_replace, part_path, file_path)
 
     async def save_thumbnail(
         self, file_content: bytes, project_id: uuid.UUID, export_id: uuid.UUID
     ) -> str:
         """Save an export thumbnail and return the relative path."""
         project_dir = self.thumbnails_path / str(project_id)
-        project_dir.mkdir(parents=True, exist_ok=True)
+        await self._ensure_dir(project_dir)
 
         unique_filename = f"thumb_{export_id}.jpg"
         file_path = project_dir / unique_filename
 
-        async with aiofiles.open(file_path, "wb") as f:
-            await f.write(file_content)
+        await asyncio.to_thread(_write_file, file_path, file_content)
 
         return str(file_path.relative_to(self.base_path))
 
     def get_full_path(self, relative_path: str) -> Path:
         """Get the full filesystem path from a relative path."""
         full_path = (self.base_path / relative_path).resolve()
-        base_resolved = self.base_path.resolve()
         # Ensure the resolved path is within the base storage directory
-        if not str(full_path).startswith(str(base_resolved) + "/") and full_path != base_resolved:
+        if not full_path.is_relative_to(self._base_resolved):
             raise ValueError("Invalid path: path traversal detected")
         return full_path
 
     def get_url(self, relative_path: str) -> str:
         """Get the URL for serving a file."""
-        return f"/storage/{relative_path}"
+        return "/storage/" + relative_path
 
     async def delete_file(self, relative_path: str) -> bool:
         """Delete a file and return True if successful."""
@@ -128,16 +223,23 @@ class StorageService:
 
     async def delete_project_files(self, project_id: uuid.UUID) -> None:
         """Delete all files for a project."""
-        for path in [
-            self.uploads_path,
-            self.styled_path,
-            self.videos_path,
-            self.exports_path,
-            self.thumbnails_path,
-        ]:
-            project_dir = path / str(project_id)
-            if project_dir.exists():
-                shutil.rmtree(project_dir)
+        project_dirs = [
+            path / str(project_id)
+            for path in [
+                self.uploads_path,
+                self.styled_path,
+                self.videos_path,
+                self.exports_path,
+                self.thumbnails_path,
+            ]
+        ]
+        for project_dir in project_dirs:
+            self._created_dirs.discard(project_dir)
+
+        # Remove the directory trees concurrently, off the event loop
+        await asyncio.gather(
+            *(asyncio.to_thread(_remove_tree, project_dir) for project_dir in project_dirs)
+        )
 
 
 storage_service = StorageService()
@@ -3,6 +3,7 @@
 import asyncio
 import uuid
 from collections.abc import AsyncGenerator
+from pathlib import Path
 
 import pytest
 import pytest_asyncio
@@ -14,6 +15,7 @@ from app.core.database import Base, get_db
 from app.core.security import create_access_token
 from app.main import app
 from app.models.user import User
+from app.services.storage import storage_service
 
 # Use SQLite for testing
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -94,3 +96,17 @@ async def client(test_session: AsyncSession) -> AsyncGenerator[AsyncClient, None
         yield ac
 
     app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="function")
+def storage_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point the storage service at a temporary directory."""
+    monkeypatch.setattr(storage_service, "base_path", tmp_path)
+    monkeypatch.setattr(storage_service, "uploads_path", tmp_path / "uploads")
+    monkeypatch.setattr(storage_service, "styled_path", tmp_path / "styled")
+    monkeypatch.setattr(storage_service, "videos_path", tmp_path / "videos")
+    monkeypatch.setattr(storage_service, "exports_path", tmp_path / "exports")
+    monkeypatch.setattr(storage_service, "thumbnails_path", tmp_path / "thumbnails")
+    monkeypatch.setattr(storage_service, "_base_resolved", tmp_path.resolve())
+    monkeypatch.setattr(storage_service, "_created_dirs", set())
+    return tmp_path
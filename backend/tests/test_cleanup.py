@@ -0,0 +1,143 @@
+"""Tests for the file cleanup service."""
+
+import logging
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.models.photo import Photo
+from app.models.project import Project
+from app.models.styled_variant import StyledVariant
+from app.models.user import User
+from app.models.video import Export, Video
+from app.services import cleanup
+from app.services.cleanup import cleanup_service
+
+
+@pytest.fixture(scope="function", autouse=True)
+def cleanup_storage(
+    storage_dir: Path, test_engine: AsyncEngine, monkeypatch: pytest.MonkeyPatch
+) -> Path:
+    """Point the cleanup service at the temporary storage and test database."""
+    monkeypatch.setattr(cleanup.settings, "storage_path", storage_dir)
+    monkeypatch.setattr(cleanup.settings, "orphan_cleanup_enabled", True)
+    monkeypatch.setattr(cleanup_service, "storage_path", storage_dir)
+    monkeypatch.setattr(
+        cleanup,
+        "background_session_maker",
+        async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False),
+    )
+    return storage_dir
+
+
+@pytest_asyncio.fixture(scope="function")
+async def project(test_session: AsyncSession, test_user: User) -> Project:
+    """Create a project owned by the test user."""
+    project = Project(user_id=test_user.id, name="Test Project")
+    test_session.add(project)
+    await test_session.commit()
+    await test_session.refresh(project)
+    return project
+
+
+def write_files(storage_dir: Path, *relative_paths: str) -> None:
+    """Create files under the storage directory."""
+    for relative_path in relative_paths:
+        path = storage_dir / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"data")
+
+
+@pytest.mark.asyncio
+async def test_cleanup_orphaned_files(
+    test_session: AsyncSession, project: Project, cleanup_storage: Path
+):
+    """Test referenced files survive and unreferenced files are removed."""
+    referenced = [
+        f"uploads/{project.id}/photo.jpg",
+        f"styled/{project.id}/photo_styled.jpg",
+        f"styled/{project.id}/variant.jpg",
+        f"videos/{project.id}/scene.mp4",
+    ]
+    orphaned = [
+        f"uploads/{project.id}/orphan.jpg",
+        f"styled/{project.id}/old_variant.jpg",
+        f"videos/{project.id}/nested/orphan.mp4",
+        "videos/stray.mp4",
+    ]
+    write_files(cleanup_storage, *referenced, *orphaned)
+
+    photo = Photo(
+        project_id=project.id,
+        original_path=referenced[0],
+        styled_path=referenced[1],
+        position=0,
+    )
+    test_session.add(photo)
+    await test_session.flush()
+    test_session.add(StyledVariant(photo_id=photo.id, styled_path=referenced[2], style="lego"))
+    test_session.add(
+        Video(
+            project_id=project.id, photo_id=photo.id, video_path=referenced[3], video_type="scene"
+        )
+    )
+    await test_session.commit()
+
+    deleted = await cleanup_service.cleanup_orphaned_files()
+
+    assert deleted == {"uploads": 1, "styled": 1, "videos": 2}
+    assert all((cleanup_storage / path).exists() for path in referenced)
+    assert not any((cleanup_storage / path).exists() for path in orphaned)
+
+
+@pytest.mark.asyncio
+async def test_cleanup_old_exports(
+    test_session: AsyncSession,
+    test_engine: AsyncEngine,
+    project: Project,
+    cleanup_storage: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+):
+    """Test expired exports are deleted in batches along with their files."""
+    monkeypatch.setattr(cleanup, "DELETE_BATCH_SIZE", 2)
+    expired = datetime.now(UTC) - timedelta(days=30)
+
+    # Five expired exports; only the first has a file left on disk
+    export_paths = [f"exports/{project.id}/export{i}.mp4" for i in range(5)]
+    write_files(cleanup_storage, export_paths[0])
+    for path in export_paths:
+        test_session.add(
+            Export(project_id=project.id, status="ready", file_path=path, created_at=expired)
+        )
+    recent = Export(project_id=project.id, status="ready", file_path="exports/recent.mp4")
+    expired_failed = Export(project_id=project.id, status="failed", created_at=expired)
+    test_session.add_all([recent, expired_failed])
+    await test_session.commit()
+    kept_ids = {recent.id, expired_failed.id}
+
+    delete_statements = []
+
+    def record_delete(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("DELETE FROM exports"):
+            delete_statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", record_delete)
+    try:
+        with caplog.at_level(logging.INFO, logger=cleanup.__name__):
+            deleted_count = await cleanup_service.cleanup_old_exports(retention_days=7)
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", record_delete)
+
+    assert deleted_count == 5
+    assert len(delete_statements) == 3
+    assert not (cleanup_storage / export_paths[0]).exists()
+    deleted_logs = [r for r in caplog.records if "Deleted old export file" in r.getMessage()]
+    assert len(deleted_logs) == 1
+
+    remaining = (await test_session.execute(select(Export.id))).scalars().all()
+    assert set(remaining) == kept_ids
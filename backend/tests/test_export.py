@@ -0,0 +1,129 @@
+"""Tests for export processing."""
+
+import uuid
+from pathlib import Path
+
+import pytest
+from PIL import Image
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.api.routes.export import process_export
+from app.core.database import Base
+from app.models.photo import Photo
+from app.models.project import Project
+from app.models.user import User
+from app.models.video import Export, Video
+from app.services.fal_ai import fal_ai_service
+from app.services.ffmpeg import ffmpeg_service
+
+SCENE_COUNT = 4
+
+
+async def create_export(db_url: str) -> tuple[Export, list[str]]:
+    """Create a project with selected scene videos and a pending export."""
+    engine = create_async_engine(db_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+        user = User(id=uuid.uuid4(), email="test@example.com", name="Test User", google_id="g")
+        db.add(user)
+        await db.flush()
+        project = Project(user_id=user.id, name="Test Project")
+        db.add(project)
+        await db.flush()
+
+        scene_paths = []
+        for i in range(SCENE_COUNT):
+            photo = Photo(project_id=project.id, original_path=f"uploads/{i}.jpg", position=i)
+            db.add(photo)
+            await db.flush()
+            scene_paths.append(f"videos/scene{i}.mp4")
+            db.add(
+                Video(
+                    project_id=project.id,
+                    photo_id=photo.id,
+                    video_path=scene_paths[i],
+                    video_type="scene",
+                    status="ready",
+                    is_selected=True,
+                    position=i,
+                )
+            )
+
+        export = Export(project_id=project.id, status="pending")
+        db.add(export)
+        await db.commit()
+
+    await engine.dispose()
+    return export, scene_paths
+
+
+@pytest.fixture(scope="function")
+def concatenated(monkeypatch: pytest.MonkeyPatch) -> list[Path]:
+    """Fake ffmpeg, recording the clips passed to the final concat."""
+    clips: list[Path] = []
+
+    async def extract_frame(video_path, output_path, position="last"):
+        Image.new("RGB", (8, 8)).save(output_path, format="PNG")
+        return output_path
+
+    async def concatenate_videos(video_paths, output_path, transition_duration=0):
+        clips.extend(Path(path) for path in video_paths)
+        Path(output_path).write_bytes(b"export")
+        return output_path
+
+    monkeypatch.setattr(ffmpeg_service, "extract_frame", extract_frame)
+    monkeypatch.setattr(ffmpeg_service, "concatenate_videos", concatenate_videos)
+    return clips
+
+
+@pytest.mark.asyncio
+async def test_failed_transition_becomes_hard_cut(
+    tmp_path: Path,
+    storage_dir: Path,
+    concatenated: list[Path],
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Test a failed transition is replaced by a hard cut at its own position."""
+    db_url = f"sqlite+aiosqlite:///{tmp_path / 'export.db'}"
+    export, scene_paths = await create_export(db_url)
+    started = []
+
+    async def generate_transition(start_image_path, end_image_path, output_path, **kwargs):
+        started.append(start_image_path)
+        # Fail the transition after the second scene
+        if len(started) == 2:
+            raise RuntimeError("transition failed")
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_bytes(b"transition")
+        return output_path
+
+    monkeypatch.setattr(fal_ai_service, "generate_transition", generate_transition)
+
+    await process_export(export.id, export.project_id, db_url, include_transitions=True)
+
+    engine = create_async_engine(db_url)
+    async with AsyncSession(engine) as db:
+        export = await db.get(Export, export.id)
+        transitions = (
+            (await db.execute(select(Video).where(Video.video_type == "transition")))
+            .scalars()
+            .all()
+        )
+    await engine.dispose()
+
+    assert export.status == "ready"
+    assert sorted(video.position for video in transitions) == [0, 2]
+
+    transition_paths = {video.position: storage_dir / video.video_path for video in transitions}
+    scenes = [storage_dir / path for path in scene_paths]
+    assert concatenated == [
+        scenes[0],
+        transition_paths[0],
+        scenes[1],
+        scenes[2],
+        transition_paths[2],
+        scenes[3],
+    ]
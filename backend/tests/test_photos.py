@@ -0,0 +1,93 @@
+"""Tests for photo upload endpoints."""
+
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.routes import photos
+from app.models.project import Project
+from app.models.user import User
+
+
+@pytest_asyncio.fixture(scope="function")
+async def project(test_session: AsyncSession, test_user: User) -> Project:
+    """Create a project owned by the test user."""
+    project = Project(user_id=test_user.id, name="Test Project")
+    test_session.add(project)
+    await test_session.commit()
+    await test_session.refresh(project)
+    return project
+
+
+@pytest.fixture(scope="function", autouse=True)
+def no_prompt_generation(monkeypatch: pytest.MonkeyPatch):
+    """Skip the background prompt generation started after uploads."""
+
+    async def generate_prompt_for_photo(*args):
+        return None
+
+    monkeypatch.setattr(photos, "generate_prompt_for_photo", generate_prompt_for_photo)
+
+
+def stored_files(storage_dir: Path) -> list[Path]:
+    """List every file under the uploads directory."""
+    return [path for path in (storage_dir / "uploads").rglob("*") if path.is_file()]
+
+
+@pytest.mark.asyncio
+async def test_upload_photos(
+    client: AsyncClient, auth_headers: dict, project: Project, storage_dir: Path
+):
+    """Test uploading several photos keeps request order."""
+    files = [("files", (f"photo{i}.jpg", b"x" * (i + 1), "image/jpeg")) for i in range(3)]
+    response = await client.post(
+        f"/api/projects/{project.id}/photos", files=files, headers=auth_headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [photo["position"] for photo in data] == [0, 1, 2]
+    sizes = [(storage_dir / photo["original_path"]).stat().st_size for photo in data]
+    assert sizes == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_upload_photos_too_large(
+    client: AsyncClient,
+    auth_headers: dict,
+    project: Project,
+    storage_dir: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Test an oversized file rejects the upload and leaves no files behind."""
+    monkeypatch.setattr(photos, "MAX_FILE_SIZE", 100)
+    files = [
+        ("files", ("small1.jpg", b"x" * 50, "image/jpeg")),
+        ("files", ("large.jpg", b"x" * 500, "image/jpeg")),
+        ("files", ("small2.jpg", b"x" * 50, "image/jpeg")),
+    ]
+    response = await client.post(
+        f"/api/projects/{project.id}/photos", files=files, headers=auth_headers
+    )
+    assert response.status_code == 400
+    assert "large.jpg" in response.json()["detail"]
+    assert stored_files(storage_dir) == []
+
+
+@pytest.mark.asyncio
+async def test_upload_photos_bad_extension(
+    client: AsyncClient, auth_headers: dict, project: Project, storage_dir: Path
+):
+    """Test a disallowed file type is rejected before anything is written."""
+    files = [
+        ("files", ("photo.jpg", b"x", "image/jpeg")),
+        ("files", ("script.exe", b"x", "application/octet-stream")),
+    ]
+    response = await client.post(
+        f"/api/projects/{project.id}/photos", files=files, headers=auth_headers
+    )
+    assert response.status_code == 400
+    assert ".exe" in response.json()["detail"]
+    assert not (storage_dir / "uploads").exists()